@@ -0,0 +1,194 @@
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# ─── Session export & item analysis ───────────────────────────────────────────
+# export_session() pages through one room's responses and writes a columnar
+# file (Parquet, or Feather for *.feather). item_stats() works on any number
+# of those files concatenated together, fully vectorized.
+#
+#   python analytics.py session1.parquet session2.parquet [...]
+
+RESPONSE_COLUMNS = ["session", "room", "question_id", "nickname", "answer",
+                    "timestamp", "type", "ans", "correct", "latency_s"]
+
+# Upper / lower groups for the classic discrimination index
+DISCRIMINATION_FRACTION = 0.27
+
+
+def _to_datetime(ts):
+    # Firestore may hand back protobuf Timestamps or datetimes
+    return ts.ToDatetime() if hasattr(ts, "ToDatetime") else ts
+
+
+def iter_responses(db, room, page_size=500):
+    """
+    Yields the response dicts of `room`, reading `page_size` documents per
+    request and continuing from a cursor (no offset re-reads).
+    """
+    query = (db.collection("responses")
+               .where("room", "==", room)
+               .order_by("__name__")
+               .limit(page_size))
+    last = None
+    while True:
+        page = list((query.start_after(last) if last else query).stream())
+        for d in page:
+            yield d.to_dict()
+        if len(page) < page_size:
+            return
+        last = page[-1]
+
+
+def responses_frame(responses, questions, session, opened_at=None):
+    """
+    Builds the export table from response dicts and the question list.
+    `latency_s` is measured from the question's open time when known
+    (`opened_at`: {question_id: datetime}), otherwise from the question's
+    first response.
+    """
+    df = pd.DataFrame.from_records(list(responses),
+                                   columns=["room", "question_id", "nickname",
+                                            "answer", "timestamp"])
+    df["session"] = session
+    df["question_id"] = df["question_id"].astype("int32")
+    df["timestamp"] = pd.to_datetime([_to_datetime(t) for t in df["timestamp"]], utc=True)
+
+    qdf = pd.DataFrame({
+        "question_id": np.arange(len(questions), dtype="int32"),
+        "type":        [q.get("type", "") for q in questions],
+        "ans":         [q.get("ans", "") for q in questions],
+    })
+    df = df.merge(qdf, on="question_id", how="left")
+    df["correct"] = (df["type"] == "mc") & (df["answer"] == df["ans"])
+
+    start = df.groupby("question_id")["timestamp"].transform("min")
+    if opened_at:
+        opened = df["question_id"].map(
+            {int(k): pd.Timestamp(_to_datetime(v)) for k, v in opened_at.items()})
+        start = opened.fillna(start)
+    df["latency_s"] = (df["timestamp"] - start).dt.total_seconds()
+
+    for col in ("session", "room", "nickname", "answer", "type", "ans"):
+        df[col] = df[col].astype("string").astype("category")
+    return df[RESPONSE_COLUMNS]
+
+
+def write_frame(df, dest, fmt="parquet"):
+    """Writes `df` to a path or binary file object as Parquet or Feather."""
+    if fmt == "feather" or (isinstance(dest, str) and dest.endswith(".feather")):
+        df.reset_index(drop=True).to_feather(dest)
+    else:
+        df.to_parquet(dest, index=False)
+
+
+def session_label():
+    """Default session name: the UTC export time."""
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def export_session(db, room, questions, dest, session=None, opened_at=None, fmt="parquet"):
+    """Pages through `room`'s responses and writes them to `dest`. Returns the frame."""
+    session = session or session_label()
+    df = responses_frame(iter_responses(db, room), questions, session, opened_at)
+    write_frame(df, dest, fmt)
+    return df
+
+
+def load_sessions(paths):
+    """Concatenates exported files (Parquet or Feather) into one frame."""
+    frames = [pd.read_feather(p) if str(p).endswith(".feather") else pd.read_parquet(p)
+              for p in paths]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=RESPONSE_COLUMNS)
+
+
+def item_stats(df):
+    """
+    Per (room, question_id) across all sessions in `df`, MC items only:
+      n, difficulty (proportion correct), discrimination (upper 27% minus
+      lower 27% proportion correct, groups ranked by session score),
+      point_biserial (item vs. rest-of-test score) and median_latency_s.
+    """
+    mc = df[df["type"] == "mc"].copy()
+    if mc.empty:
+        return pd.DataFrame(columns=["room", "question_id", "n", "difficulty",
+                                     "discrimination", "point_biserial",
+                                     "median_latency_s"])
+    mc["correct"] = mc["correct"].astype("float64")
+
+    # Player score within their own session, and the player's percentile
+    # rank in it (one row per player, so players who answered more items
+    # do not weigh more in the 27% groups)
+    player = ["session", "nickname"]
+    players = mc.groupby(player, observed=True)["correct"].sum().rename("score").reset_index()
+    pct = players.groupby("session", observed=True)["score"].rank(pct=True, method="average")
+    players["group"] = np.select([pct >= 1 - DISCRIMINATION_FRACTION,
+                                  pct <= DISCRIMINATION_FRACTION], [1, -1], 0)
+    mc = mc.merge(players, on=player, how="left")
+    mc["rest"] = mc["score"] - mc["correct"]
+
+    keys = ["room", "question_id"]
+    g = mc.groupby(keys, observed=True)
+    out = g.agg(n=("correct", "size"),
+                difficulty=("correct", "mean"),
+                median_latency_s=("latency_s", "median"))
+
+    by_group = (mc[mc["group"] != 0]
+                .pivot_table(index=keys, columns="group", values="correct",
+                             aggfunc="mean", observed=True)
+                .reindex(columns=[-1, 1]))   # a group empty in small/tied sessions -> NaN
+    out["discrimination"] = by_group[1] - by_group[-1]
+
+    # Pearson r between a 0/1 item and the rest score, from grouped moments
+    mc["xy"] = mc["correct"] * mc["rest"]
+    mc["yy"] = mc["rest"] ** 2
+    m = mc.groupby(keys, observed=True)[["correct", "rest", "xy", "yy"]].mean()
+    cov = m["xy"] - m["correct"] * m["rest"]
+    sx = np.sqrt(m["correct"] * (1 - m["correct"]))
+    sy = np.sqrt(m["yy"] - m["rest"] ** 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["point_biserial"] = cov / (sx * sy)
+
+    return out.reset_index()[["room", "question_id", "n", "difficulty",
+                              "discrimination", "point_biserial",
+                              "median_latency_s"]]
+
+
+def distractor_rates(df):
+    """Share of MC responses choosing each option, one row per (room, question_id)."""
+    mc = df[df["type"] == "mc"]
+    return (pd.crosstab([mc["room"], mc["question_id"]], mc["answer"], normalize="index")
+              .reset_index())
+
+
+def _check_small_sessions():
+    """item_stats on 1-player, all-tied and 2-player sessions (no empty-group crash)."""
+    def session(name, results):
+        return pd.DataFrame([
+            {"session": name, "room": "r", "question_id": q, "nickname": nick,
+             "type": "mc", "correct": ok, "latency_s": 1.0}
+            for nick, row in results.items() for q, ok in enumerate(row)
+        ])
+
+    one = item_stats(session("one", {"a": [True, False]}))
+    assert one["discrimination"].isna().all(), one
+    tied = item_stats(session("tied", {"a": [True, False], "b": [True, False], "c": [True, False]}))
+    assert tied["discrimination"].isna().all(), tied
+    # percentile ranks 0.5 / 1.0: only an upper group, so still undefined
+    two = item_stats(session("two", {"a": [True, True], "b": [False, True]}))
+    assert two["discrimination"].isna().all(), two
+    assert list(two["difficulty"]) == [0.5, 1.0], two
+    print("ok: item_stats on 1-player, tied and 2-player sessions")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--check"]:
+        _check_small_sessions()
+        sys.exit()
+    if len(sys.argv) < 2:
+        sys.exit("usage: python analytics.py EXPORT [EXPORT ...] | --check")
+    frame = load_sessions(sys.argv[1:])
+    with pd.option_context("display.width", 160, "display.max_rows", None):
+        print(item_stats(frame).round(3).to_string(index=False))
@@ -0,0 +1,145 @@
+import html
+
+import streamlit as st
+
+from tracing import span
+
+# ─── Paginated "Student Answers" wall ─────────────────────────────────────────
+# Reads one page of a question's responses per tick, continuing from a
+# Firestore cursor, and renders the whole page as a single HTML block.
+#
+# Order is stable: responses are keyed <room>_<question>_<sha1(question:player)>
+# (see store.response_id), so ordering by document ID is a pseudo-random
+# shuffle of the players, different for every question, that does not change
+# between ticks; new answers slot into place instead of reshuffling the wall.
+
+PAGE_SIZE = 24
+BG_COLORS = ["#E3F2FD", "#FCE4EC", "#E8F5E9", "#FFF3E0", "#F3E5F5"]
+
+# content-visibility lets the browser skip layout/paint of off-screen cards
+_WALL_CSS = """
+<style>
+.answer-wall { max-height: 70vh; overflow-y: auto; }
+.answer-wall .card {
+  content-visibility: auto;
+  contain-intrinsic-size: auto 64px;
+  padding: 16px;
+  margin: 10px 0;
+  border-radius: 10px;
+  text-align: center;
+  font-size: 1.4rem;
+  font-weight: bold;
+  transition: all 0.3s ease;
+}
+.answer-wall .card:hover { transform: scale(1.03); }
+</style>
+"""
+
+
+def fetch_page(db, question_id, cursor=None, page_size=PAGE_SIZE):
+    """
+    One page of answers for `question_id` after `cursor` (a DocumentSnapshot).
+    Returns (answers, last_snapshot, has_more).
+    """
+    query = (db.collection("responses")
+               .where("question_id", "==", question_id)
+               .order_by("__name__")
+               .limit(page_size + 1))       # one extra row tells us if there is more
+    if cursor is not None:
+        query = query.start_after(cursor)
+    docs = list(query.stream())
+    page = docs[:page_size]
+    answers = [d.to_dict().get("answer", "") for d in page]
+    return answers, (page[-1] if page else None), len(docs) > page_size
+
+
+def count_answers(db, question_id):
+    """Server-side count aggregation (no documents are transferred)."""
+    result = db.collection("responses").where("question_id", "==", question_id).count().get()
+    return int(result[0][0].value)
+
+
+def render_html(answers, offset=0):
+    """The whole page as one HTML string (answers are escaped)."""
+    cards = "".join(
+        f'<div class="card" style="background-color:{BG_COLORS[(offset + i) % len(BG_COLORS)]};">'
+        f"{html.escape(str(a))}</div>"
+        for i, a in enumerate(answers)
+    )
+    return f'{_WALL_CSS}<div class="answer-wall">{cards}</div>'
+
+
+def show_answer_wall(db, question_id, page_size=PAGE_SIZE):
+    """
+    Renders the answer wall for `question_id` with Prev/Next paging.
+    Per-session state: the current page and the cursor of each visited page.
+    """
+    state = st.session_state.setdefault("answer_wall", {})
+    if state.get("question_id") != question_id:
+        state.clear()
+        state.update(question_id=question_id, page=0, cursors=[None])
+
+    page = state["page"]
+    with span("responses_wall"):
+        answers, last, has_more = fetch_page(db, question_id, state["cursors"][page], page_size)
+        total = count_answers(db, question_id)
+
+    # the next page starts after this page's current last answer: a new
+    # answer sorting before it moves the boundary, so refresh it every tick
+    # (and forget later cursors, which may now skip answers)
+    cursors = state["cursors"]
+    del cursors[page + 1:]
+    if has_more:
+        cursors.append(last)
+
+    if not answers:
+        st.write("No responses submitted yet.")
+        return
+
+    st.markdown(render_html(answers, offset=page * page_size), unsafe_allow_html=True)
+
+    pages = max(1, -(-total // page_size))
+    if pages > 1:
+        prev_col, info_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            if st.button("◀ Prev", key=f"wall_prev_{question_id}", disabled=page == 0):
+                state["page"] -= 1
+                st.rerun()
+        with info_col:
+            st.caption(f"{total} answers · page {page + 1} / {pages}")
+        with next_col:
+            if st.button("Next ▶", key=f"wall_next_{question_id}", disabled=not has_more):
+                state["page"] += 1
+                st.rerun()
+
+
+def show_answer_clusters(load_responses, question_id, correct=None, version=None):
+    """
+    Counts per cluster of free-text answers (see clustering.py).
+    `load_responses(question_id)` returns [(doc_id, response dict)]. The
+    clusterer lives in session_state, so each tick only assigns responses
+    that are new or changed since the previous one. Pass the game-state
+    `version` once submissions are closed: responses are then read only
+    once for that version.
+    """
+    from clustering import AnswerClusters
+
+    state = st.session_state.setdefault("answer_clusters", {})
+    if state.get("question_id") != question_id:
+        state.clear()
+        state.update(question_id=question_id, clusters=AnswerClusters(correct))
+    clusters = state["clusters"]
+
+    if version is None or state.get("version") != version:
+        with span("responses_clusters"):
+            for doc_id, r in load_responses(question_id):
+                clusters.add(doc_id, r.get("answer", ""))
+        state["version"] = version
+
+    rows = clusters.summary()
+    if not rows:
+        return
+    st.markdown("\n".join(
+        f"- {'✅ ' if ok else ''}**{html.escape(label)}** — {n}"
+        for label, n, ok in rows
+    ))
@@ -0,0 +1,98 @@
+import streamlit as st
+
+from tracing import traced
+
+# ─── Answer charts ────────────────────────────────────────────────────────────
+# matplotlib is imported on first draw, so entry points with charts turned
+# off (see quiz_engine.Config) never load it.
+
+
+@traced("render_chart")
+def plot_mc_bar_vert(answer_counts):
+    import matplotlib.pyplot as plt
+    # 1) Slightly taller canvas to fit vertical bars
+    fig, ax = plt.subplots(figsize=(11, 4), dpi=80)
+
+    # 2) Vertical bars: keys→x, values→height
+    bars = ax.bar(
+        list(answer_counts.keys()),       # x positions
+        list(answer_counts.values()),     # bar heights
+        width=0.2,                        # thickness of each bar
+        color="#90CAF9",
+        edgecolor="none"
+    )
+
+    # 3) Ticks/fonts: x labels are the answer choices
+    ax.tick_params(axis="x", labelsize=8, rotation=0, pad=2)
+    ax.tick_params(axis="y", labelsize=8)
+
+    # 4) Slim spines
+    for spine in ["top", "right"]:
+        ax.spines[spine].set_visible(False)
+    ax.spines["left"].set_linewidth(0.5)
+    ax.spines["bottom"].set_linewidth(0.5)
+
+    # 5) Annotate counts above each bar
+    for bar in bars:
+        h = bar.get_height()
+        ax.text(
+            bar.get_x() + bar.get_width() / 2,  # center of the bar
+            h + 0.1,                            # just above the top
+            f"{int(h)}",
+            ha="center",
+            va="bottom",
+            fontsize=8
+        )
+
+    # 6) Light horizontal gridlines
+    ax.grid(axis="y", linestyle="--", alpha=0.3, linewidth=0.5)
+
+    plt.tight_layout(pad=0.2)
+
+    # 7) Display in Streamlit
+    st.pyplot(fig)
+
+@traced("render_chart")
+def plot_mc_bar_hor(answer_counts):
+    import matplotlib.pyplot as plt
+
+    # 1) Small canvas
+    fig, ax = plt.subplots(figsize=(11, 1), dpi=80)
+
+    # 2) Thin bars
+    bars = ax.barh(
+        list(answer_counts.keys()),
+        list(answer_counts.values()),
+        height=0.05,
+        color="#90CAF9",
+        edgecolor="none"
+    )
+
+    # 3) Small ticks/fonts
+    ax.tick_params(axis="y", labelsize=8)
+    ax.tick_params(axis="x", labelsize=8)
+    ax.xaxis.set_tick_params(pad=2)
+
+    # 4) Slim spines
+    for spine in ["top", "right"]:
+        ax.spines[spine].set_visible(False)
+    ax.spines["left"].set_linewidth(0.5)
+    ax.spines["bottom"].set_linewidth(0.5)
+
+    # 5) Annotate counts
+    for bar in bars:
+        w = bar.get_width()
+        ax.text(
+            w + 0.1,
+            bar.get_y() + bar.get_height() / 2,
+            f"{int(w)}",
+            va="center",
+            fontsize=8
+        )
+
+    # 6) Light grid and layout
+    ax.grid(axis="x", linestyle="--", alpha=0.3, linewidth=0.5)
+    plt.tight_layout(pad=0.2)
+
+    # 7) Show in Streamlit
+    st.pyplot(fig)
@@ -0,0 +1,175 @@
+import re
+import time
+import unicodedata
+
+HEAD_SIZE = 64                # clusters considered for fuzzy matches
+
+# ─── Free-text answer clustering ──────────────────────────────────────────────
+# Groups typed answers that differ only in case, punctuation, whitespace or a
+# few typos. Incremental: each response is assigned once, on arrival, and a
+# repeated normalized string is a dict hit. A new string is compared with the
+# correct answer first, then only with the HEAD_SIZE largest clusters, so the
+# cost per answer stays flat as one-off typos pile up as singleton clusters.
+#
+#   python clustering.py        # benchmark
+
+
+def normalize_answer(text) -> str:
+    text = unicodedata.normalize("NFKC", str(text)).casefold()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance, giving up as soon as it must exceed `limit`
+    (returns limit + 1 in that case).
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) > len(b):
+        a, b = b, a
+    prev = list(range(len(a) + 1))
+    for j, cb in enumerate(b, 1):
+        cur = [j]
+        best = j
+        for i, ca in enumerate(a, 1):
+            v = min(prev[i] + 1, cur[i - 1] + 1, prev[i - 1] + (ca != cb))
+            cur.append(v)
+            best = min(best, v)
+        if best > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+def edit_budget(text: str) -> int:
+    """
+    Typos tolerated for a string of this length: one per 5 characters, at
+    least one from 4 characters up ("croup", "apnea"), none for shorter
+    answers ("RSV" vs "RSA" are different answers).
+    """
+    return max(1, len(text) // 5) if len(text) >= 4 else 0
+
+
+class AnswerClusters:
+    """
+    Clusters for one question. `add(key, answer)` is idempotent per key
+    (e.g. the response document ID) and handles a changed answer by moving
+    the key to its new cluster.
+    """
+
+    def __init__(self, correct=None):
+        self.labels = []          # display label per cluster (first raw answer seen)
+        self.reps = []            # normalized representative per cluster
+        self.counts = []
+        self.correct_cluster = None
+        self._by_norm = {}        # normalized text -> cluster index
+        self._head = {}           # representative length -> [cluster index], largest clusters
+        self._head_stale = 0      # clusters added / counts changed since _head was built
+        self._assigned = {}       # key -> (raw answer, cluster index)
+        if correct:
+            self.correct_cluster = self._cluster_for(str(correct), normalize_answer(correct))
+
+    def _new_cluster(self, raw, norm):
+        c = len(self.reps)
+        self.labels.append(raw.strip())
+        self.reps.append(norm)
+        self.counts.append(0)
+        if len(self.reps) <= HEAD_SIZE:
+            self._head.setdefault(len(norm), []).append(c)
+        return c
+
+    def _refresh_head(self):
+        """Rebuilds the largest-clusters index every HEAD_SIZE updates."""
+        self._head_stale += 1
+        if self._head_stale < HEAD_SIZE or len(self.reps) <= HEAD_SIZE:
+            return
+        self._head_stale = 0
+        self._head = {}
+        top = sorted(range(len(self.reps)), key=lambda c: -self.counts[c])[:HEAD_SIZE]
+        for c in top:
+            self._head.setdefault(len(self.reps[c]), []).append(c)
+
+    def _cluster_for(self, raw, norm):
+        c = self._by_norm.get(norm)
+        if c is not None:
+            return c
+        limit = edit_budget(norm)
+        # most typed answers are attempts at the correct one: try it first
+        if self.correct_cluster is not None:
+            if bounded_edit_distance(norm, self.reps[self.correct_cluster], limit) <= limit:
+                self._by_norm[norm] = self.correct_cluster
+                return self.correct_cluster
+        # fuzzy match: largest clusters whose length is within budget
+        best, best_d = None, limit + 1
+        for n in range(len(norm) - limit, len(norm) + limit + 1):
+            for cand in self._head.get(n, ()):
+                d = bounded_edit_distance(norm, self.reps[cand], min(limit, best_d - 1))
+                if d < best_d:
+                    best, best_d = cand, d
+        if best is None:
+            best = self._new_cluster(raw, norm)
+        self._by_norm[norm] = best
+        return best
+
+    def add(self, key, answer):
+        raw = str(answer)
+        prev = self._assigned.get(key)
+        if prev is not None:
+            if prev[0] == raw:
+                return prev[1]
+            self.counts[prev[1]] -= 1
+        c = self._cluster_for(raw, normalize_answer(raw))
+        self.counts[c] += 1
+        self._refresh_head()
+        self._assigned[key] = (raw, c)
+        return c
+
+    def summary(self):
+        """[(label, count, is_correct)] largest first, empty clusters omitted."""
+        rows = [(self.labels[c], n, c == self.correct_cluster)
+                for c, n in enumerate(self.counts) if n]
+        return sorted(rows, key=lambda r: -r[1])
+
+
+if __name__ == "__main__":
+    import random
+
+    rng = random.Random(0)
+    words = ["bronchiolitis", "croup", "pertussis", "asthma exacerbation",
+             "foreign body aspiration", "pneumonia", "epiglottitis", "RSV"]
+
+    def noisy(w):
+        w = list(rng.choice([w, w.upper(), w.title(), f"  {w}. "]))
+        for _ in range(rng.choice([0, 0, 1, 2])):
+            i = rng.randrange(len(w))
+            w[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+        return "".join(w)
+
+    for n in (500, 2000, 10000):
+        sources = [rng.choice(words) for _ in range(n)]
+        answers = [noisy(w) for w in sources]
+        clusters = AnswerClusters(correct="Bronchiolitis")
+        t = time.perf_counter()
+        assigned = [clusters.add(i, a) for i, a in enumerate(answers)]
+        full = time.perf_counter() - t
+        # a tick where 10 new answers arrive on top of everything already seen
+        t = time.perf_counter()
+        for i, a in enumerate(answers + [noisy(rng.choice(words)) for _ in range(10)]):
+            clusters.add(i, a)
+        tick = time.perf_counter() - t
+        # did each source answer merge: share of its answers in the cluster
+        # of its clean spelling (noisy() makes ~25% two-typo variants, which
+        # words under 10 characters do not absorb)
+        merged = []
+        for w in words:
+            home = clusters._by_norm.get(normalize_answer(w))
+            got = [c for c, src in zip(assigned, sources) if src == w]
+            merged.append((w, got.count(home) / len(got)))
+        ok = sum(share >= 0.5 for _, share in merged)
+        print(f"{n:>6} answers: {len(clusters.summary()):>4} clusters, "
+              f"{ok}/{len(words)} sources merged (majority in one cluster), "
+              f"initial {full * 1000:7.1f} ms, next tick {tick * 1000:6.1f} ms")
+    print("  share in the clean spelling's cluster: " +
+          ", ".join(f"{w} {share:.0%}" for w, share in merged))
@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta, timezone
+
+from firebase_admin import firestore
+
+# ─── Game state machine ───────────────────────────────────────────────────────
+# game_state/current holds the single source of truth for every client:
+#
+#   waiting ──start──▶ question ──reveal──▶ revealed ──next──▶ question ...
+#                                              └──results──▶ results
+#                                     (on the last question, results only)
+#
+# Each transition runs in a transaction that compare-and-sets `version`, so a
+# double click or a second host tab fails with StaleState instead of skipping
+# a question. `version` only ever increases; a client that has already
+# rendered version N can skip re-reading anything tied to it.
+#
+# Optional timer: a question opened with a time limit gets `time_limit_s`.
+# Its deadline is the server-stamped open time plus that limit; after it,
+# submit_answer() rejects writes, players treat the question as closed, and
+# the host performs the reveal on its next refresh (auto_reveal).
+
+STATE_DOC = "game_state/current"
+
+WAITING = "waiting"
+QUESTION = "question"
+REVEALED = "revealed"
+RESULTS = "results"
+
+# (phase, action) -> next phase
+TRANSITIONS = {
+    (WAITING, "start"):    QUESTION,
+    (QUESTION, "reveal"):  REVEALED,
+    (REVEALED, "next"):    QUESTION,
+    (REVEALED, "results"): RESULTS,
+}
+
+DEFAULT_STATE = {"phase": WAITING, "current_index": 0, "version": 0}
+
+
+class StaleState(Exception):
+    """The state changed (or the action is not allowed) since it was read."""
+
+
+class QuestionClosed(Exception):
+    """The answer was submitted after the question closed."""
+
+
+def _with_defaults(data):
+    state = dict(DEFAULT_STATE)
+    state.update(data or {})
+    return state
+
+
+def read_state(db):
+    """The current state (defaults if the document does not exist yet)."""
+    return _with_defaults(db.document(STATE_DOC).get().to_dict())
+
+
+def deadline(state):
+    """When the current question closes (UTC datetime), or None if untimed."""
+    limit = state.get("time_limit_s")
+    opened = (state.get("opened_at") or {}).get(str(state["current_index"]))
+    if state["phase"] != QUESTION or not limit or not isinstance(opened, datetime):
+        return None
+    return opened + timedelta(seconds=limit)
+
+
+def is_closed(state):
+    """True once answers are no longer accepted (revealed or timed out)."""
+    return state["phase"] != QUESTION or seconds_left(state) == 0
+
+
+def seconds_left(state):
+    """Seconds until the deadline (never negative), or None if untimed."""
+    end = deadline(state)
+    if end is None:
+        return None
+    return max(0.0, (end - datetime.now(timezone.utc)).total_seconds())
+
+
+@firestore.transactional
+def _transition(transaction, ref, action, expected_version, total_q, time_limits):
+    state = _with_defaults(ref.get(transaction=transaction).to_dict())
+    if state["version"] != expected_version:
+        raise StaleState(f"expected version {expected_version}, found {state['version']}")
+    phase = TRANSITIONS.get((state["phase"], action))
+    if phase is None:
+        raise StaleState(f"cannot {action} while {state['phase']}")
+
+    update = {"phase": phase, "version": state["version"] + 1,
+              "started": phase != WAITING}
+    if action == "next":
+        # no wrap-around: reopening Q0 would restamp its opened_at and reopen
+        # its responses; after the last question only "results" is allowed
+        if total_q is None or state["current_index"] + 1 >= total_q:
+            raise StaleState("no question after the last one")
+        update["current_index"] = state["current_index"] + 1
+    if phase == QUESTION:
+        # open time per question, used to score answer latency
+        idx = update.get("current_index", state["current_index"])
+        update["opened_at"] = {str(idx): firestore.SERVER_TIMESTAMP}
+        update["time_limit_s"] = (time_limits or {}).get(idx)
+    transaction.set(ref, update, merge=True)
+    state.update(update)
+    return state
+
+
+def transition(db, action, expected_version, total_q=None, time_limits=None):
+    """
+    Applies `action` if the state is still at `expected_version`. Returns the
+    new state; raises StaleState if another click or tab got there first.
+    `time_limits` ({question index: seconds}) sets the timer of the question
+    being opened, if any.
+    """
+    ref = db.document(STATE_DOC)
+    return _transition(db.transaction(), ref, action, expected_version, total_q, time_limits)
+
+
+@firestore.transactional
+def _reset(transaction, ref):
+    state = _with_defaults(ref.get(transaction=transaction).to_dict())
+    fresh = dict(DEFAULT_STATE, version=state["version"] + 1,
+                 started=False, opened_at={}, time_limit_s=None)
+    transaction.set(ref, fresh)  # replaces the document: no stale fields
+    return fresh
+
+
+def reset(db):
+    """
+    Back to WAITING for a new game. The document is rewritten rather than
+    deleted, so `version` keeps increasing and nothing cached for an
+    earlier version can be mistaken for the new game's.
+    """
+    return _reset(db.transaction(), db.document(STATE_DOC))
+
+
+def auto_reveal(db, state):
+    """
+    Reveals the answer if the current question's deadline has passed.
+    Returns the state to render (re-read if anything changed). Host only:
+    players would all race for the same transaction at the deadline.
+    """
+    if seconds_left(state) != 0:
+        return state
+    try:
+        transition(db, "reveal", state["version"])
+    except StaleState:
+        pass  # someone else revealed it first
+    return read_state(db)
+
+
+@firestore.transactional
+def _submit(transaction, state_ref, response_ref, question_id, data):
+    state = _with_defaults(state_ref.get(transaction=transaction).to_dict())
+    key = data.get("client_key")
+    if key is not None:
+        existing = response_ref.get(transaction=transaction)
+        if (existing.to_dict() or {}).get("client_key") == key:
+            return False  # a retry of a write that already landed
+    if state["phase"] != QUESTION or state["current_index"] != question_id:
+        raise QuestionClosed("this question is not open")
+    if seconds_left(state) == 0:
+        raise QuestionClosed("time is up")
+    transaction.set(response_ref, data)
+    return True
+
+
+def submit_answer(db, response_ref, question_id, data):
+    """
+    Writes `data` to `response_ref` only while `question_id` is open, in one
+    transaction with the state read, so a reveal or deadline that lands first
+    makes the write fail with QuestionClosed. If `data` has a `client_key`
+    (idempotency key) that the stored response already carries, nothing is
+    written, even after the question closed. Returns True if written.
+    """
+    return _submit(db.transaction(), db.document(STATE_DOC), response_ref, question_id, data)
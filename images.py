@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError, wait
+from io import BytesIO
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ─── Repo image fetching ──────────────────────────────────────────────────────
+# One pooled keep-alive session per process (no TCP+TLS handshake per image).
+# All candidate filenames are requested concurrently and the first success
+# wins; the whole lookup is bounded by DEADLINE_S. Concurrent calls for the
+# same image share one lookup. Found images are downsized to MAX_IMAGE_WIDTH
+# and kept in a small LRU; images that are definitely missing (every
+# candidate answered 404) are remembered for MISS_TTL_S. Timeouts and errors
+# are not cached, so a slow GitHub does not hide an existing image.
+
+IMAGE_BASE_URL = "https://raw.githubusercontent.com/conkraw/shelf_reflection/main/"
+IMAGE_EXTS = [".png", ".PNG", ".jpg", ".JPG", ".jpeg", ".JPEG", ".gif", ".GIF"]
+
+DEADLINE_S = 2.5
+MISS_TTL_S = 300
+MAX_CACHED = 64
+MAX_IMAGE_WIDTH = 1280
+
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=len(IMAGE_EXTS) * 2))
+_pool = ThreadPoolExecutor(max_workers=len(IMAGE_EXTS) * 2, thread_name_prefix="image-fetch")
+
+_lock = threading.Lock()
+_hits = OrderedDict()         # image field -> bytes
+_misses = {}                  # image field -> expiry (monotonic)
+_inflight = {}                # image field -> Future of the running lookup
+
+_MISSING = object()           # a candidate answered 404
+
+
+def image_candidates(name):
+    """Filenames to try for an image field: as-is if it has an extension."""
+    name = name.strip()
+    if os.path.splitext(name)[1]:
+        return [name]
+    return [name + ext for ext in IMAGE_EXTS]
+
+
+def presize(data, max_width=MAX_IMAGE_WIDTH):
+    """Downscales images wider than `max_width`; other images are kept as-is."""
+    from PIL import Image
+
+    img = Image.open(BytesIO(data))
+    if img.width <= max_width or getattr(img, "is_animated", False):
+        return data
+    fmt = img.format
+    img = img.resize((max_width, round(img.height * max_width / img.width)), Image.LANCZOS)
+    out = BytesIO()
+    img.save(out, format=fmt)
+    return out.getvalue()
+
+
+def _get(url, timeout):
+    """Body on 200, _MISSING on 404, None on any other failure."""
+    try:
+        r = _session.get(url, timeout=timeout)
+    except requests.RequestException:
+        return None
+    if r.status_code == 200:
+        return r.content
+    return _MISSING if r.status_code == 404 else None
+
+
+def _lookup(key, deadline):
+    """(bytes or None, True if every candidate is known to be missing)."""
+    end = time.monotonic() + deadline
+    pending = {_pool.submit(_get, IMAGE_BASE_URL + fn, deadline) for fn in image_candidates(key)}
+    data, missing = None, 0
+    total = len(pending)
+    while pending and data is None:
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for f in done:
+            result = f.result()
+            if result is _MISSING:
+                missing += 1
+            elif result is not None:
+                data = data or result
+    for f in pending:
+        f.cancel()
+    if data is not None:
+        data = presize(data)
+    return data, missing == total
+
+
+def fetch_image(image_field, deadline=DEADLINE_S):
+    """
+    Bytes of the first candidate that exists on GitHub, or None if none
+    does (remembered for MISS_TTL_S) or none arrived within `deadline`
+    seconds (not remembered).
+    """
+    key = image_field.strip()
+    with _lock:
+        if key in _hits:
+            _hits.move_to_end(key)
+            return _hits[key]
+        if _misses.get(key, 0) > time.monotonic():
+            return None
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = Future()
+
+    if not leader:
+        # single flight: wait for the lookup another session started
+        try:
+            return flight.result(timeout=deadline)
+        except TimeoutError:
+            return None
+
+    data = None
+    try:
+        data, missing = _lookup(key, deadline)
+        with _lock:
+            if data is not None:
+                _misses.pop(key, None)
+                _hits[key] = data
+                if len(_hits) > MAX_CACHED:
+                    _hits.popitem(last=False)
+            elif missing:
+                _misses[key] = time.monotonic() + MISS_TTL_S
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+        flight.set_result(data)
+    return data
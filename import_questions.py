@@ -0,0 +1,210 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+
+from images import IMAGE_BASE_URL, image_candidates
+
+# ─── Question-bank import ─────────────────────────────────────────────────────
+# Validates a question bank against what app.py expects and uploads it to the
+# `quiz_id` collection (docs "0", "1", ...) in parallel batched writes.
+#
+#   python import_questions.py bank.xlsx my_quiz --credentials sa.json
+#   python import_questions.py bank.csv my_quiz --dry-run
+#
+# Columns / keys: id (optional, defaults to row order), text, type ("mc" or
+# "text"), options (list, or "|"-separated in CSV/XLSX), ans, image (optional),
+# time_limit (optional, seconds).
+
+QUESTION_TYPES = {"mc", "text"}
+BATCH_SIZE = 500              # Firestore's per-batch write limit
+WORKERS = 8
+
+
+def read_bank(path):
+    """Rows as a list of dicts, from .json, .csv, .xlsx/.xls."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".json":
+        with open(path) as f:
+            data = json.load(f)
+        if isinstance(data, dict):          # {"0": {...}, "1": {...}}
+            return [dict(v, id=k) for k, v in data.items()]
+        return list(data)
+    if ext == ".csv":
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    elif ext in (".xlsx", ".xls"):
+        df = pd.read_excel(path, dtype=str, keep_default_na=False)
+    else:
+        raise ValueError(f"unsupported file type: {ext}")
+    rows = df.to_dict("records")
+    for r in rows:
+        if isinstance(r.get("options"), str):
+            r["options"] = [o.strip() for o in r["options"].split("|") if o.strip()]
+    return rows
+
+
+def validate(rows):
+    """
+    Returns (questions, problems): questions is {doc_id: question dict} for
+    every valid row, problems a list of "item N: message" strings covering
+    every invalid one.
+    """
+    questions, problems = {}, []
+    for n, row in enumerate(rows):
+        label = f"item {n + 1}"
+        errs = []
+        raw_id = row.get("id", "")
+        raw_id = n if raw_id in ("", None) else raw_id
+        try:
+            qid = int(str(raw_id).strip())
+            if qid < 0:
+                raise ValueError
+        except ValueError:
+            errs.append(f"id {raw_id!r} is not a non-negative integer")
+            qid = None
+        if qid is not None and qid in questions:
+            errs.append(f"duplicate id {qid}")
+
+        text = str(row.get("text") or "").strip()
+        if not text:
+            errs.append("missing text")
+        qtype = str(row.get("type") or "").strip().lower()
+        if qtype not in QUESTION_TYPES:
+            errs.append(f"type {row.get('type')!r} is not one of {sorted(QUESTION_TYPES)}")
+
+        q = {"text": text, "type": qtype}
+        ans = row.get("ans")
+        ans = "" if ans is None else str(ans).strip()
+        if qtype == "mc":
+            options = [str(o).strip() for o in (row.get("options") or [])]
+            if len(options) < 2:
+                errs.append("mc question needs at least two options")
+            elif ans not in options:
+                errs.append(f"ans {ans!r} is not one of the options")
+            q["options"] = options
+        if ans:
+            q["ans"] = ans
+        image = str(row.get("image") or "").strip()
+        if image:
+            q["image"] = image
+        limit = str(row.get("time_limit") or "").strip()
+        if limit:
+            if limit.isdigit() and int(limit) > 0:
+                q["time_limit"] = int(limit)
+            else:
+                errs.append(f"time_limit {limit!r} is not a positive number of seconds")
+
+        if errs:
+            problems.extend(f"{label}: {e}" for e in errs)
+        else:
+            questions[qid] = q
+
+    # the app reads docs "0".."n-1" by position, so ids must have no gaps
+    expected = set(range(len(rows)))
+    if not problems and set(questions) != expected:
+        problems.append(f"ids must be 0..{len(rows) - 1}; "
+                        f"missing {sorted(expected - set(questions))}, "
+                        f"unexpected {sorted(set(questions) - expected)}")
+    return questions, problems
+
+
+def resolve_image(name, base_dir, session):
+    """
+    The first existing candidate filename for `name`, checked on disk next
+    to the bank and then on GitHub, or None.
+    """
+    candidates = image_candidates(name)
+    for fn in candidates:
+        if os.path.exists(os.path.join(base_dir, fn)):
+            return fn
+    for fn in candidates:
+        try:
+            if session.head(IMAGE_BASE_URL + fn, timeout=5).status_code == 200:
+                return fn
+        except requests.RequestException:
+            pass
+    return None
+
+
+def resolve_images(questions, base_dir):
+    """
+    Rewrites each `image` to the filename that exists (so the app never has
+    to probe extensions at runtime). Returns problems for unresolved ones.
+    """
+    with_image = [(qid, q) for qid, q in questions.items() if q.get("image")]
+    problems = []
+    with requests.Session() as session, ThreadPoolExecutor(WORKERS) as pool:
+        found = pool.map(lambda item: resolve_image(item[1]["image"], base_dir, session), with_image)
+        for (qid, q), fn in zip(with_image, found):
+            if fn is None:
+                problems.append(f"id {qid}: image {q['image']!r} not found")
+            else:
+                q["image"] = fn
+    return problems
+
+
+def upload(db, quiz_id, questions, clear=False):
+    """Writes `questions` to `quiz_id` in parallel batches of BATCH_SIZE."""
+    coll = db.collection(quiz_id)
+
+    def commit(ops):
+        batch = db.batch()
+        for op in ops:
+            op(batch)
+        batch.commit()
+
+    def run(ops):
+        chunks = [ops[i:i + BATCH_SIZE] for i in range(0, len(ops), BATCH_SIZE)]
+        with ThreadPoolExecutor(WORKERS) as pool:
+            list(pool.map(commit, chunks))
+
+    if clear:
+        stale = [d.reference for d in coll.stream() if not d.id.isdigit() or int(d.id) not in questions]
+        run([lambda b, r=r: b.delete(r) for r in stale])
+    run([lambda b, qid=qid, q=q: b.set(coll.document(str(qid)), q)
+         for qid, q in sorted(questions.items())])
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Validate and import a question bank into Firestore.")
+    p.add_argument("bank", help="question bank (.json, .csv, .xlsx)")
+    p.add_argument("quiz_id", help="Firestore collection to write (st.secrets['quiz_id'])")
+    p.add_argument("--credentials", default=os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"),
+                   help="service account JSON (default: $GOOGLE_APPLICATION_CREDENTIALS)")
+    p.add_argument("--dry-run", action="store_true", help="validate only, do not upload")
+    p.add_argument("--clear", action="store_true", help="delete docs not in the bank")
+    p.add_argument("--skip-images", action="store_true", help="do not resolve images")
+    args = p.parse_args(argv)
+
+    t = time.perf_counter()
+    rows = read_bank(args.bank)
+    questions, problems = validate(rows)
+    if not args.skip_images:
+        problems += resolve_images(questions, os.path.dirname(os.path.abspath(args.bank)))
+
+    print(f"{len(rows)} items read, {len(problems)} problem(s)")
+    for msg in problems:
+        print(f"  ❌ {msg}")
+    if problems:
+        return 1
+    if args.dry_run:
+        print(f"✅ valid ({time.perf_counter() - t:.2f}s), nothing uploaded")
+        return 0
+
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(credentials.Certificate(args.credentials))
+    upload(firestore.client(), args.quiz_id, questions, clear=args.clear)
+    print(f"✅ uploaded {len(questions)} questions to `{args.quiz_id}` "
+          f"in {time.perf_counter() - t:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from player_state import freeze
+from tracing import span
+
+# ─── Next-question lookahead ──────────────────────────────────────────────────
+# While the host shows the answer to question idx, warm_next() fetches question
+# idx+1 and its image in the background. The caches are module level, so
+# every session in the process (the projector and all phones) gets the warm
+# copy when the host advances. With a cross-replica store configured
+# (share_through), question docs are also shared between replicas.
+
+QUESTION_TTL_S = 600
+
+_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="lookahead")
+_lock = threading.Lock()
+_questions = {}               # (collection, idx) -> (question dict or None, expiry)
+_warming = set()
+_shared = None                # replicas store, see share_through()
+
+
+def share_through(store):
+    """Also look up / publish question docs in a cross-replica store."""
+    global _shared
+    _shared = store
+
+
+def get_question(db, collection, idx):
+    """
+    Question `idx` of `collection` (doc str(idx)), or None if it does not
+    exist. Read once and shared (frozen) by all sessions for QUESTION_TTL_S.
+    """
+    key = (collection, idx)
+    with _lock:
+        hit = _questions.get(key)
+    if hit is not None and hit[1] > time.monotonic():
+        return hit[0]
+    data = _shared.get(f"question:{collection}:{idx}") if _shared is not None else None
+    if data is None:
+        with span("question_doc"):
+            doc = db.collection(collection).document(str(idx)).get()
+        data = doc.to_dict() if doc.exists else None
+        if data is not None and _shared is not None:
+            _shared.set(f"question:{collection}:{idx}", data, QUESTION_TTL_S)
+    q = freeze(data)
+    with _lock:
+        _questions[key] = (q, time.monotonic() + QUESTION_TTL_S)
+    return q
+
+
+def empty_aggregate(q):
+    """Zero count per option, so the chart has every choice from the first tick."""
+    return {opt: 0 for opt in q.get("options", [])} if q and q.get("type") == "mc" else {}
+
+
+def _warm(db, collection, idx, images):
+    try:
+        q = get_question(db, collection, idx)
+        if images and q and q.get("image"):
+            from images import fetch_image
+            fetch_image(q["image"])
+    finally:
+        with _lock:
+            _warming.discard((collection, idx))
+
+
+def warm_next(db, collection, idx, images=True):
+    """Starts warming question `idx` (no-op if already warm or in flight)."""
+    key = (collection, idx)
+    with _lock:
+        hit = _questions.get(key)
+        if key in _warming or (hit is not None and hit[1] > time.monotonic()):
+            return
+        _warming.add(key)
+    _pool.submit(_warm, db, collection, idx, images)
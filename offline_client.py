@@ -0,0 +1,117 @@
+import base64
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+from streamlit_autorefresh import st_autorefresh
+
+from game_state import REVEALED, QuestionClosed, is_closed, seconds_left
+from store import has_response, participant_id, submit_response
+
+# ─── Offline-tolerant player client ───────────────────────────────────────────
+# The question form runs in a small browser component
+# (components/answer_queue/index.html) that keeps the current question and
+# any unsent answers in localStorage:
+#
+#   - an answer is queued on the device first, with a random idempotency key,
+#     and resent on reconnect (and every few seconds) until the server
+#     acknowledges it; submit_response(client_key=...) makes a resend of an
+#     answer that already landed a no-op;
+#   - the component reports which question it holds, so after a reconnect or
+#     reload the server sends only the game state, not the question text and
+#     image again;
+#   - the form is only redrawn when the question, phase or submitted flag
+#     changes, so the 2 s refresh does not wipe what the student is typing.
+#
+# Enabled with SHELF_OFFLINE_PLAYER=1 or st.secrets["offline_player"].
+
+_answer_queue = components.declare_component(
+    "answer_queue",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "answer_queue"),
+)
+
+MAX_ACKS = 32                 # acknowledged keys remembered per session
+
+
+def enabled():
+    return bool(os.environ.get("SHELF_OFFLINE_PLAYER") or st.secrets.get("offline_player"))
+
+
+def _slot(state, idx):
+    """Identifies one opening of question `idx` (a replayed quiz gets a new one)."""
+    opened = (state.get("opened_at") or {}).get(str(idx))
+    stamp = round(opened.timestamp() * 1000) if hasattr(opened, "timestamp") else 0
+    return f"{idx}:{stamp}"
+
+
+def _image_url(data):
+    """data: URL for image bytes, so the browser can keep them in localStorage."""
+    mime = ("image/png" if data[:4] == b"\x89PNG" else
+            "image/gif" if data[:4] == b"GIF8" else "image/jpeg")
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def _question_payload(idx, q, load_image):
+    payload = {"idx": idx, "text": q["text"], "type": q["type"],
+               "options": list(q.get("options") or ())}
+    image = load_image(q["image"]) if load_image and q.get("image") else None
+    if image is not None:
+        payload["image"] = _image_url(image)
+    return payload
+
+
+def _flush(db, room, nick, player, queued, acks):
+    """Submits queued answers not acknowledged yet and records the outcome."""
+    for item in queued:
+        key = item.get("key")
+        if not key or key in acks:
+            continue
+        idx = int(item["idx"])
+        try:
+            submit_response(db, room, idx, nick, item["answer"], client_key=key)
+        except QuestionClosed:
+            acks[key] = "closed"
+            continue
+        acks[key] = "ok"
+        player.mark_submitted(idx)
+    while len(acks) > MAX_ACKS:
+        acks.pop(next(iter(acks)))
+
+
+def offline_player(db, room, nick, state, player, load_question, load_image=None):
+    """
+    Question view of the offline-tolerant player mode. `load_question(idx)`
+    returns the question (or None) and `load_image(field)` image bytes (or
+    None); both are only called when the browser does not hold question
+    `idx` yet.
+    """
+    idx = player.active_idx
+    acks = st.session_state.setdefault("answer_acks", {})
+    reported = st.session_state.get("answer_queue") or {}
+    _flush(db, room, nick, player, reported.get("queue") or (), acks)
+
+    question = None
+    if reported and reported.get("cached") != idx:
+        q = load_question(idx)
+        if q is None:
+            st.error(f"No question found for index {idx}")
+            st.stop()
+        question = _question_payload(idx, q, load_image)
+
+    if player.needs_check(idx):
+        player.mark_submitted(idx, has_response(db, room, idx, nick))
+
+    _answer_queue(
+        room=room,
+        player=participant_id(nick),
+        idx=idx,
+        slot=_slot(state, idx),
+        phase=REVEALED if is_closed(state) else state["phase"],
+        seconds_left=seconds_left(state),
+        submitted=player.is_submitted(idx),
+        question=question,
+        acks=dict(acks),
+        key="answer_queue",
+        default=None,
+    )
+    st_autorefresh(interval=2000, key=f"offline_refresh_{idx}")
@@ -0,0 +1,83 @@
+import sys
+from types import MappingProxyType
+
+# ─── Compact per-player session state ─────────────────────────────────────────
+# Hundreds of player sessions share one Streamlit process, so each one keeps
+# only a few ints: the question it is on, the game-state version it last
+# rendered, and two bitsets (bit i = question i). Question dicts are never
+# copied into a session; they are frozen once and shared through the
+# process-wide caches (lookahead.get_question, the quiz package).
+#
+#   python player_state.py      # bytes per connected player, before/after
+
+
+class PlayerState:
+    __slots__ = ("active_idx", "state_version", "submitted", "checked")
+
+    def __init__(self):
+        self.active_idx = None
+        self.state_version = None
+        self.submitted = 0        # bit i: answer to question i was written
+        self.checked = 0          # bit i: `submitted` bit i is known (see needs_check)
+
+    def is_submitted(self, idx):
+        return bool(self.submitted >> idx & 1)
+
+    def mark_submitted(self, idx, submitted=True):
+        self.checked |= 1 << idx
+        if submitted:
+            self.submitted |= 1 << idx
+
+    def needs_check(self, idx):
+        """True until we know whether question `idx` was already answered."""
+        return not self.checked >> idx & 1
+
+    def forget(self, idx):
+        mask = ~(1 << idx)
+        self.submitted &= mask
+        self.checked &= mask
+
+
+def freeze(q):
+    """Read-only view of a question dict, safe to share between sessions."""
+    if q is None or isinstance(q, MappingProxyType):
+        return q
+    q = dict(q)
+    if isinstance(q.get("options"), list):
+        q["options"] = tuple(q["options"])
+    return MappingProxyType(q)
+
+
+if __name__ == "__main__":
+    import tracemalloc
+
+    PLAYERS, QUESTIONS = 500, 40
+
+    def before():
+        # submitted_<i> kept for every answered question (the question dict
+        # was a per-rerun local, not session state)
+        ss = {f"submitted_{i}": True for i in range(QUESTIONS)}
+        ss.update(active_idx=QUESTIONS - 1, state_version=2 * QUESTIONS)
+        return ss
+
+    def after():
+        p = PlayerState()
+        for i in range(QUESTIONS):
+            p.mark_submitted(i)
+        p.active_idx, p.state_version = QUESTIONS - 1, 2 * QUESTIONS
+        return {"player": p}
+
+    def per_player(make):
+        tracemalloc.start()
+        base = tracemalloc.take_snapshot()
+        sessions = [make() for _ in range(PLAYERS)]
+        stats = tracemalloc.take_snapshot().compare_to(base, "filename")
+        tracemalloc.stop()
+        del sessions
+        return sum(s.size_diff for s in stats) / PLAYERS
+
+    b, a = per_player(before), per_player(after)
+    print(f"{PLAYERS} players x {QUESTIONS} questions answered "
+          f"(python {sys.version_info.major}.{sys.version_info.minor})")
+    print(f"  before: {b:8.0f} bytes/player")
+    print(f"  after:  {a:8.0f} bytes/player  ({b / a:.1f}x smaller)")
@@ -0,0 +1,643 @@
+import base64
+import os
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Optional
+
+import streamlit as st
+
+from tracing import span, traced, summary as trace_summary
+
+# ─── Quiz engine ──────────────────────────────────────────────────────────────
+# The host and player app behind both entry points. Optional features are
+# switched on per entry point by a Config:
+#
+#   app.py            Config()                   images, charts, Parquet export
+#   app_nopicture.py  Config(images=False, charts=False, export=False,
+#                            collection="questions", ...)  plus its own wording
+#
+# A feature that is off is never imported: the no-picture mode does not load
+# requests, PIL, matplotlib or the image pipeline (images.py), which keeps its
+# cold start short.
+
+
+@dataclass(frozen=True)
+class Config:
+    images: bool = True                 # question images (repo / quiz package)
+    charts: bool = True                 # answer-count chart on the MC reveal
+    export: bool = True                 # Parquet download on the results screen
+    collection: Optional[str] = None    # question collection; None: st.secrets["quiz_id"]
+    host_title: Optional[str] = None    # title above the host controls, if any
+    podium: tuple = ("🍬", "🍩", "🍭")    # markers for the top three players
+    big_results: bool = True            # results in large centered headings
+    nickname_prompt: str = "Pick a fun nickname to play (avoid using real names)"
+
+
+# ─── Optional quiz package (see quiz_package.py) ──────────────────────────────
+@st.cache_resource
+def _open_quiz_package(path, mtime):
+    from quiz_package import QuizPackage
+    return QuizPackage(path)
+
+def quiz_package():
+    """The configured quiz package (shared by all sessions), or None."""
+    path = os.environ.get("SHELF_QUIZ_PACKAGE") or st.secrets.get("quiz_package")
+    return _open_quiz_package(path, os.path.getmtime(path)) if path else None
+
+def load_image(image_field):
+    """Image bytes from the quiz package, else from the repo (images.py)."""
+    pkg = quiz_package()
+    if pkg is not None:
+        data = pkg.image(image_field)
+        if data is not None:
+            return data
+    from images import fetch_image
+    return fetch_image(image_field)
+
+@traced()
+def display_repo_image(image_field: str):
+    """
+    Given an image_field like "test" or "diagram.jpg",
+    tries a variety of extensions (including uppercase) and
+    renders the first one that actually exists on GitHub.
+    """
+    data = load_image(image_field)
+    if data is not None:
+        #st.image(BytesIO(data), use_container_width=True)
+        st.image(BytesIO(data))
+        return
+
+    # nothing worked (remembered for a few minutes, see images.py)
+    from images import image_candidates
+    st.warning(f"Could not find image `{image_field}` "
+               f"(tried {', '.join(image_candidates(image_field))})")
+
+
+# ─── 1) Login and Firestore ───────────────────────────────────────────────────
+def _ask_role():
+    """Asks for the code once; stops the run until a role is known."""
+    if "role" in st.session_state:
+        return
+    st.title("🔐 Enter Quiz Code")
+    code = st.text_input("Password or game PIN", type="password")
+    if st.button("Join"):
+        if code == st.secrets["host_password"]:
+            st.session_state.role = "host"
+            st.rerun()
+        elif code == st.secrets["game_pin"]:
+            st.session_state.role = "player"
+            st.rerun()
+        else:
+            st.error("❌ Invalid code.")
+    st.stop()
+
+def _connect():
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    firebase_creds = st.secrets["firebase_service_account"].to_dict()
+    if not firebase_admin._apps:
+        cred = credentials.Certificate(firebase_creds)
+        firebase_admin.initialize_app(cred)
+    return firestore.client()
+
+
+# ─── 2) Helpers ───────────────────────────────────────────────────────────────
+@traced()
+def load_questions(db, room):
+    pkg = quiz_package()
+    if pkg is not None:
+        return pkg.questions
+    try:
+        # doc ids are "0", "1", ...: sort numerically ("10" after "9"), the
+        # same order get_question() uses on the player side
+        docs = list(db.collection(room).stream())
+        docs.sort(key=lambda d: int(d.id))
+
+        questions = []
+        for doc in docs:
+            data = doc.to_dict()
+            if data is None:
+                st.warning(f"Document {doc.id} has no data.")
+                continue
+            questions.append(data)
+        if not questions:
+            st.warning("⚠️ No questions found in Firestore – check your collection name and rules.")
+        return questions
+
+    except Exception as e:
+        # Show the error in the app so you can see exactly what's wrong
+        st.error(f"❌ Failed to load questions from Firestore:\n{e}")
+        # Stop the app here so you don’t run into downstream indexing errors
+        st.stop()
+
+@st.cache_resource
+def _coordinator(_db):
+    """One per process: cross-replica cache + leader election (replicas.py)."""
+    import lookahead
+    from replicas import Coordinator, store_from_env
+    store = store_from_env()
+    if store is None:
+        return None
+    lookahead.share_through(store)
+    return Coordinator(_db, store).start()
+
+def current_state(db):
+    """Game state from the replica cache when fresh, else from Firestore."""
+    from game_state import read_state
+    coordinator = _coordinator(db)
+    state = coordinator.state() if coordinator is not None else None
+    return state if state is not None else read_state(db)
+
+def question_responses(db, idx):
+    """
+    [(doc_id, response dict)] for question idx, read from Firestore. Used for
+    the once-per-version reveal aggregates, so it must include every answer
+    accepted before the reveal.
+    """
+    return [(d.id, d.to_dict()) for d in
+            db.collection("responses").where("question_id", "==", idx).stream()]
+
+def browser_token():
+    """Random per-browser token, kept in the page URL so a reload keeps it."""
+    token = st.query_params.get("player")
+    if not token:
+        token = uuid.uuid4().hex
+        st.query_params["player"] = token
+    return token
+
+def question_time_limits(questions):
+    """
+    {index: seconds} for timed questions: a question's own `time_limit`,
+    else st.secrets["question_time_limit"]; untimed if neither is set.
+    """
+    default = st.secrets.get("question_time_limit")
+    limits = {i: q.get("time_limit", default) for i, q in enumerate(questions)}
+    return {i: int(t) for i, t in limits.items() if t}
+
+def advance(db, action, state, total_q=None, time_limits=None):
+    """Host button handler: apply a game-state transition (see game_state.py)."""
+    from game_state import StaleState, transition
+    try:
+        transition(db, action, state["version"], total_q, time_limits)
+    except StaleState:
+        pass  # a double click or another host tab already moved the game on
+    st.rerun()
+
+
+# ─── 3) Host View ─────────────────────────────────────────────────────────────
+def host_view(config, db, room):
+    from streamlit_autorefresh import st_autorefresh
+    from answer_wall import show_answer_wall, show_answer_clusters
+    from lookahead import warm_next, empty_aggregate
+    from game_state import (read_state, auto_reveal, seconds_left, reset as reset_game,
+                            WAITING, REVEALED, RESULTS)
+
+    if config.host_title:
+        st.title(config.host_title)
+    # ─── Optional timing panel (set SHELF_TRACE=1) ───────────────
+    if os.environ.get("SHELF_TRACE"):
+        with st.sidebar.expander("⏱️ Rerun timings"):
+            for name, s in sorted(trace_summary().items()):
+                st.markdown(
+                    f"**{name}** — n={s['count']}, "
+                    f"mean {s['mean_ms']:.1f} ms, max {s['max_ms']:.1f} ms"
+                )
+                st.caption(", ".join(f"{b}: {n}" for b, n in s["buckets"].items()))
+
+    if st.button("🗑️ Reset Game Data"):
+        # 1) Delete participants
+        for doc in db.collection("participants").stream():
+            doc.reference.delete()
+        # 2) Delete responses
+        for doc in db.collection("responses").stream():
+            doc.reference.delete()
+        # 3) Back to the waiting room (version keeps counting up)
+        reset_game(db)
+        for key in ("questions", "reveal_cache", "answer_clusters", "answer_wall"):
+            st.session_state.pop(key, None)
+
+        st.success("✅ All game data has been reset.")
+        st.rerun()
+
+    # ─── Shared game state (one read per rerun) ───────────────────
+    # (closes a timed question whose deadline has passed; the host reads
+    # Firestore directly so its own transitions show up immediately)
+    state = auto_reveal(db, read_state(db))
+
+    params = st.query_params               # new property-based API
+    if params.get("start_quiz") == ["1"]:
+        # clear the param so a refresh won’t re-start
+        st.set_query_params()
+        advance(db, "start", state, time_limits=question_time_limits(load_questions(db, room)))
+
+    # ─── Waiting Room Screen ──────────────────────────────────────
+    if state["phase"] == WAITING:
+        import qrcode
+
+        # build the QR PNG as before…
+        url = "https://peds-clerkship-shelf-reflection.streamlit.app/"
+        qr = qrcode.make(url)
+        buf = BytesIO(); qr.save(buf)
+        b64 = base64.b64encode(buf.getvalue()).decode()
+
+        st.markdown(
+            f"""
+            <style>
+              /* center the entire waiting container */
+              .waiting-room {{ text-align: center; padding: 2rem; }}
+              /* style & center the “Start Quiz” link as a button */
+              .waiting-room .start-btn {{
+                display: inline-block;
+                margin-top: 1.5rem;
+                background-color: #f63366;
+                color: white;
+                padding: 0.75em 1.5em;
+                font-size: 1.2rem;
+                border-radius: 8px;
+                text-decoration: none;
+              }}
+              .waiting-room .start-btn:hover {{
+                background-color: #e52a58;
+              }}
+            </style>
+
+            <div class="waiting-room">
+              <h1>🕒 Waiting for students to join...</h1>
+              <h2>🔢 Entry Code: <code style="font-size:1.2rem;">1234</code></h2>
+              <p>Ask students to visit this page and enter the code to join.</p>
+              <img src="data:image/png;base64,{b64}" width="200" />
+              <br>
+            </div>
+            """,
+            unsafe_allow_html=True,
+        )
+
+        # Auto-refresh so the list updates without manual reload
+        st_autorefresh(interval=2000, key="host_wait_refresh")
+
+        # Fetch & order by join time
+        docs = db.collection("participants") \
+                 .order_by("timestamp") \
+                 .stream()
+
+        rows = []
+        for i, d in enumerate(docs, start=1):
+            p = d.to_dict()
+            rows.append({"#": i, "Nickname": p["nickname"]})
+
+        if rows:
+            # Build an HTML badge for each participant
+            badges = "".join([
+                f"<span style='\
+                    display:inline-block;\
+                    background:#E3F2FD;\
+                    color:#333;\
+                    padding:8px 16px;\
+                    margin:4px;\
+                    border-radius:12px;\
+                    font-size:1rem;\
+                    font-weight:500;\
+                    box-shadow:0 2px 4px rgba(0,0,0,0.1);\
+                '>{r['#']}. {r['Nickname']}</span>"
+                for r in rows
+            ])
+
+            # Wrap in a centered container
+            st.markdown(
+                f"""
+                <div style="text-align:center; margin-top:1rem; margin-bottom:1rem;">
+                  <h3 style="margin-bottom:0.5rem;">👥 Participants Joined ({len(rows)})</h3>
+                  {badges}
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+        else:
+            st.markdown(
+                "<p style='text-align:center; font-style:italic; color:#666;'>No one has joined yet.</p>",
+                unsafe_allow_html=True
+            )
+
+        # This button will now be perfectly centered:
+        if st.button("🚀 Start Quiz"):
+            # waiting → question (opens the first question)
+            advance(db, "start", state, time_limits=question_time_limits(load_questions(db, room)))
+        st.stop()  # don’t proceed until they click
+
+    # ─── RESULTS SCREEN ────────────────────────────────────────────
+    if state["phase"] == RESULTS:
+        if config.big_results:
+            st.markdown("<h2 style='text-align: center;'>🏆 Final Quiz Results</h2>",unsafe_allow_html=True)
+        else:
+            st.header("🏆 Final Quiz Results")
+        line = st.header if config.big_results else st.markdown
+
+        # 1) One paged read of the session; latency is measured from
+        #    each question's open time (see scoring.py)
+        from scoring import session_frame, leaderboard
+        questions = load_questions(db, room)
+        with span("results_frame"):
+            frame = session_frame(db, room, questions)
+
+        # 2) Prepare leaderboard: count desc, then avg latency asc
+        board = list(leaderboard(frame).itertuples(index=False, name=None))
+
+        # 3) Show top 3
+        if board:
+            places = config.podium
+            for i, entry in enumerate(board[:3]):
+                nick, cnt, _ = entry
+                line(f"{places[i]} **{nick}** — {cnt} correct")
+            # and list anyone else
+            if len(board) > 3:
+                line("**Others:** " + ", ".join(n for n,_,_ in board[3:]))
+        else:
+            st.write("No correct answers were submitted.")
+
+        # 4) Columnar export for offline item analysis (see analytics.py)
+        if config.export:
+            from analytics import write_frame
+            buf = BytesIO()
+            write_frame(frame, buf)
+            st.download_button(
+                "⬇️ Download session (Parquet)",
+                buf.getvalue(),
+                file_name=f"{room}_responses.parquet",
+                mime="application/octet-stream",
+            )
+
+        st.stop()
+
+    # ─── Auto-refresh during quiz ─────────────────────────────────
+    st_autorefresh(interval=2000, key="host_refresh")
+
+    # ─── Load questions & index ───────────────────────────────────
+    # questions don't change during a session: read them once
+    if "questions" not in st.session_state:
+        st.session_state.questions = load_questions(db, room)
+    questions = st.session_state.questions
+    total_q = len(questions)
+    idx = state["current_index"]
+
+    q = questions[idx]
+
+    # 1) Show question (also kept on screen while the answer is revealed)
+    st.markdown(f"### Question {idx+1} / {total_q}")
+    st.write(q["text"])
+    if config.images and q.get("image"):
+        display_repo_image(q["image"])
+    if q["type"] == "mc":
+        for opt in q["options"]:
+            st.markdown(f"- {opt}")
+
+    if state["phase"] != REVEALED:
+        # server-side timer (optional): reveals automatically at the deadline
+        left = seconds_left(state)
+        if left is not None:
+            st.markdown(f"⏱️ **{int(left)} s** left")
+
+        # 2) Button to reveal answer
+        if st.button("Show Answer"):
+            advance(db, "reveal", state)
+
+    else:
+        # warm question idx+1 (doc, and image if shown) for every session
+        # while the answer is on screen, so the advance renders immediately
+        if quiz_package() is None and idx + 1 < total_q:
+            warm_next(db, room, idx + 1, images=config.images)
+
+        # 3) Show the correct answer
+        correct = q.get("ans", "")
+        st.success(f"💡 Correct Answer: **{correct}**")
+
+        # 4) If multiple‐choice, find first correct responder.
+        #    Submissions are closed once revealed, so this is computed once
+        #    per state version rather than on every refresh.
+        if q["type"] == "mc":
+            cached = st.session_state.get("reveal_cache")
+            if cached is None or cached[0] != (state["version"], idx):
+                with span("responses_reveal"):
+                    resp_docs = [r for _, r in question_responses(db, idx)]
+
+                counts = empty_aggregate(q)
+                counts.update(Counter(r.get("answer", "") for r in resp_docs))
+
+                correct_resps = []
+                for r in resp_docs:
+                    if r.get("answer") == correct:
+                        ts = r.get("timestamp")
+                        # convert Firestore ts to datetime if needed
+                        dt = ts.ToDatetime() if hasattr(ts, "ToDatetime") else ts
+                        correct_resps.append((r.get("nickname"), dt))
+                # pick the earliest
+                correct_resps.sort(key=lambda x: x[1])
+                first_nick = correct_resps[0][0] if correct_resps else None
+                cached = ((state["version"], idx), counts, first_nick)
+                st.session_state.reveal_cache = cached
+
+            _, counts, first_nick = cached
+            if config.charts:
+                from charts import plot_mc_bar_vert
+                plot_mc_bar_vert(counts)
+            if first_nick:
+                st.info(f"🏆 First correct responder: **{first_nick}**")
+            else:
+                st.info("No one has answered correctly yet.")
+
+        # 4b) Free text: group similar answers and count them
+        else:
+            show_answer_clusters(lambda i: question_responses(db, i), idx, correct,
+                                 version=state["version"])
+
+        # 5) Next Question button (Show Results after the last question)
+        if idx < total_q - 1:
+            if st.button("➡️ Next Question", key=f"next_btn_{idx}"):
+                advance(db, "next", state, total_q, question_time_limits(questions))
+        elif st.button("🏁 Show Results", key="show_results_btn"):
+            advance(db, "results", state)
+
+    # ─── Student Responses ────────────────────────────────────────
+    st.markdown("---")
+    st.subheader("📋 Student Answers")
+
+    # one cursor-paged HTML block per tick (see answer_wall.py)
+    show_answer_wall(db, idx)
+
+
+# ─── 4) Player View ───────────────────────────────────────────────────────────
+def player_view(config, db, room):
+    from streamlit_autorefresh import st_autorefresh
+    from lookahead import get_question
+    from game_state import seconds_left, is_closed, QuestionClosed, WAITING, QUESTION, RESULTS
+    from player_state import PlayerState
+    from store import join_participant, submit_response, has_response
+    import offline_client
+
+    st.title("🕹️ Quiz Player")
+
+    # ─── 1) Nickname & join logic ────────────────────────────────────
+    if not st.session_state.get("joined", False):
+        nick = st.text_input(config.nickname_prompt, key="nick_input")
+        if st.button("Join Game"):
+            if not nick.strip():
+                st.error("Please enter a valid nickname.")
+            else:
+                # keyed by normalized nickname: refreshes / double clicks
+                # from this browser land on the same participant document
+                # (the first-registered spelling is kept for everything)
+                joined_as = join_participant(db, nick, browser_token())
+                if joined_as is None:
+                    st.error("That nickname is already taken — please pick another. "
+                             "If it is yours, go back to the tab you joined from.")
+                    st.stop()
+                st.session_state.nick   = joined_as
+                st.session_state.joined = True
+                st.rerun()
+        st.stop()  # nothing else until they join
+
+    # Greet them once joined
+    nick = st.session_state.nick
+    st.markdown(f"**👋 Hello, {nick}!**")
+
+    # ─── WAIT FOR HOST ────────────────────────────────
+    # (no auto_reveal here: the host closes timed questions; a player just
+    # treats a question past its deadline as closed)
+    state = current_state(db)
+    if state["phase"] == WAITING:
+        st_autorefresh(interval=2000, key="waiting_for_host")
+        st.warning("⏳ Waiting for the host to start the quiz…")
+
+        st.markdown("""
+        ---
+        ### ℹ️ Instructions for Participants
+
+        - ⏱️ **Questions are untimed unless a countdown is shown.** A question ends when the host reveals the answer or its timer runs out.
+        - 💡 **These questions are meant to enhance your learning** and support your growth as future physicians.
+        - 🔍 While we’ve carefully reviewed all content, **some questions may still have errors.** Please feel free to reach out if you notice anything that seems incorrect.
+        - 📚 We encourage you to **use your own clinical reasoning and trusted resources** to reflect on each question.
+        - 🏅 **Top scorers are displayed at the end** — not to compete, but to recognize engagement and effort!
+        - 🤝 This is a **low-stakes, supportive environment** — your participation is what matters most.
+
+        ---
+        """)
+
+        st.stop()
+
+    if state["phase"] == RESULTS:
+        st_autorefresh(interval=5000, key="results_refresh")
+        st.success("🏁 That’s the end of the quiz — look up at the screen for the results!")
+        st.stop()
+
+    # compact per-session state: indices and bitsets only (player_state.py)
+    if "player" not in st.session_state:
+        st.session_state.player = PlayerState()
+    player = st.session_state.player
+
+    # 1) Only re-resolve the question when the state version moved on
+    if player.state_version != state["version"]:
+        fs_idx = state["current_index"]
+        if state["phase"] == QUESTION or player.active_idx != fs_idx:
+            # a new version in the question phase is a new opening (start,
+            # next, or the same index again after a reset): submitted flags
+            # from an earlier opening do not count
+            player.forget(fs_idx)
+        player.active_idx = fs_idx
+        player.state_version = state["version"]
+
+    current_idx = player.active_idx
+
+    # 2) Look up the question (shared, read-only; never copied per session)
+    pkg = quiz_package()
+
+    def lookup(i):
+        if pkg is not None:
+            return pkg.questions[i] if i < len(pkg.questions) else None
+        return get_question(db, room, i)
+
+    # offline-tolerant mode: form + answer queue live in the browser
+    if offline_client.enabled():
+        offline_client.offline_player(db, room, nick, state, player, lookup,
+                                      load_image if config.images else None)
+        st.stop()
+
+    q = lookup(current_idx)
+    if q is None:
+        st.error(f"No question found for index {current_idx}")
+        st.stop()
+
+    # 3) Submitted flag: a reload loses session_state, but the deterministic
+    #    response doc survives it
+    if player.needs_check(current_idx):
+        player.mark_submitted(current_idx, has_response(db, room, current_idx, nick))
+    submitted = player.is_submitted(current_idx)
+
+    # 4) Show the form if not yet submitted (and the question is still open)
+    if is_closed(state) and not submitted:
+        if seconds_left(state) == 0:
+            st.info("⏰ Time is up — look up at the screen")
+        else:
+            st.info("⏸️ The answer has been revealed — look up at the screen")
+        st_autorefresh(interval=2000, key=f"refresh_revealed_{current_idx}")
+
+    elif not submitted:
+        with st.form(key=f"form_{current_idx}"):
+            st.markdown(f"### Q{current_idx+1}. {q['text']}")
+            if config.images and q.get("image"):
+                display_repo_image(q["image"])
+            if q["type"] == "mc":
+                choice = st.radio("Choose one:", q["options"], key=f"mc_{current_idx}")
+            else:
+                choice = st.text_input("Your answer:", key=f"text_{current_idx}")
+            clicked = st.form_submit_button("Submit Answer")
+
+        # timed question: one rerun right at the deadline closes the form
+        # (locally; the write itself is rejected by submit_answer)
+        left = seconds_left(state)
+        if left is not None:
+            st.caption(f"⏱️ {int(left)} s left")
+            st_autorefresh(interval=int(left * 1000) + 1000, key=f"deadline_{current_idx}")
+
+        if clicked:
+            try:
+                # one document per player per question (create-or-overwrite)
+                submit_response(db, room, current_idx, nick, choice)
+            except QuestionClosed:
+                st.error("⏰ Too late — this question has closed.")
+                st.stop()
+            # mark as submitted and show confirmation
+            player.mark_submitted(current_idx)
+            st.rerun()
+
+    # 5) If already submitted, show this
+    else:
+        st.success("✅ Please look up at the screen")
+        st_autorefresh(interval=2000, key=f"refresh_after_{current_idx}")
+
+
+# ─── Entry point ──────────────────────────────────────────────────────────────
+def run(config):
+    """Renders one rerun of the app for the session's role."""
+    st.set_page_config(layout="wide")
+
+    st.markdown("""
+    <style>
+    /* Center all Streamlit buttons */
+    div.stButton > button {
+      margin: 0 auto;
+      display: block;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+    _ask_role()
+
+    # Now that we have a role, connect to Firestore
+    db = _connect()
+    room = config.collection or st.secrets["quiz_id"]
+    if st.session_state.role == "host":
+        host_view(config, db, room)
+    elif st.session_state.role == "player":
+        player_view(config, db, room)
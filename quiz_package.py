@@ -0,0 +1,156 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zipfile
+
+from player_state import freeze
+
+# ─── Quiz packages ────────────────────────────────────────────────────────────
+# A quiz package is a single zip holding the questions and their images,
+# built offline. With one configured (st.secrets["quiz_package"] or
+# $SHELF_QUIZ_PACKAGE), questions and images come from the memory-mapped file
+# and Firestore is only used for live game state and responses.
+#
+#   python quiz_package.py bank.xlsx quiz.qpkg
+#   python quiz_package.py --firestore my_quiz quiz.qpkg --credentials sa.json
+#
+# Layout: manifest.json {"format", "content_hash", "questions"} (deflated) and
+# images/<filename> (stored uncompressed: they are already compressed).
+#
+# Reading a package needs only the standard library; the build-side modules
+# (requests, PIL, pandas via images.py / import_questions.py) are imported
+# where they are used.
+
+FORMAT = 1
+
+
+def content_hash(questions, images):
+    h = hashlib.sha256(json.dumps(questions, sort_keys=True).encode("utf-8"))
+    for name in sorted(images):
+        h.update(name.encode("utf-8"))
+        h.update(hashlib.sha256(images[name]).digest())
+    return h.hexdigest()
+
+
+def fetch_image(name, base_dir):
+    path = os.path.join(base_dir, name)
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+    import requests
+    from images import IMAGE_BASE_URL
+    r = requests.get(IMAGE_BASE_URL + name, timeout=10)
+    r.raise_for_status()
+    return r.content
+
+
+def build(questions, dest, base_dir="."):
+    """
+    Writes a package for `questions` (list ordered by index, each `image`
+    already resolved to a filename). Returns the content hash.
+    """
+    from images import presize
+    images = {}
+    for q in questions:
+        name = q.get("image")
+        if name and name not in images:
+            images[name] = presize(fetch_image(name, base_dir))
+    digest = content_hash(questions, images)
+    manifest = {"format": FORMAT, "content_hash": digest, "questions": questions}
+    with zipfile.ZipFile(dest, "w") as zf:
+        zf.writestr("manifest.json", json.dumps(manifest), compress_type=zipfile.ZIP_DEFLATED)
+        for name, data in sorted(images.items()):
+            zf.writestr(f"images/{name}", data, compress_type=zipfile.ZIP_STORED)
+    return digest
+
+
+class QuizPackage:
+    """
+    Read-only view of a package file. The file is memory-mapped once per
+    process and images are stored uncompressed, so reading one is a plain
+    slice of the shared mapping.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            with zipfile.ZipFile(f) as zf:
+                manifest = json.loads(zf.read("manifest.json"))
+                self._spans = {
+                    info.filename[len("images/"):]: self._data_span(info)
+                    for info in zf.infolist() if info.filename.startswith("images/")
+                }
+        if manifest.get("format") != FORMAT:
+            raise ValueError(f"{path}: unsupported quiz package format {manifest.get('format')!r}")
+        self.questions = [freeze(q) for q in manifest["questions"]]
+        self.content_hash = manifest["content_hash"]
+        images = {n: self._read(n) for n in self._spans}
+        if content_hash(manifest["questions"], images) != self.content_hash:
+            raise ValueError(f"{path}: content hash mismatch (corrupt or edited package)")
+
+    def _data_span(self, info):
+        if info.compress_type != zipfile.ZIP_STORED:
+            raise ValueError(f"{info.filename}: images must be stored uncompressed")
+        # local file header: 30 fixed bytes, then file name and extra field
+        off = info.header_offset
+        name_len, extra_len = struct.unpack("<HH", self._map[off + 26:off + 30])
+        start = off + 30 + name_len + extra_len
+        return start, start + info.file_size
+
+    def _read(self, name):
+        start, end = self._spans[name]
+        return self._map[start:end]
+
+    def image(self, image_field):
+        """Bytes for an image field ("test" or "test.PNG"), or None."""
+        from images import image_candidates
+        for fn in image_candidates(image_field):
+            if fn in self._spans:
+                return self._read(fn)
+        return None
+
+
+def questions_from_firestore(quiz_id, credentials_path):
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(credentials.Certificate(credentials_path))
+    docs = list(firestore.client().collection(quiz_id).stream())
+    docs.sort(key=lambda d: int(d.id))
+    return [dict(d.to_dict(), id=d.id) for d in docs]
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Build a quiz package (questions + images).")
+    p.add_argument("source", nargs="?", help="question bank (.json, .csv, .xlsx)")
+    p.add_argument("dest", help="package file to write")
+    p.add_argument("--firestore", metavar="QUIZ_ID", help="read questions from this collection instead")
+    p.add_argument("--credentials", default=os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"),
+                   help="service account JSON (default: $GOOGLE_APPLICATION_CREDENTIALS)")
+    args = p.parse_args(argv)
+    if bool(args.source) == bool(args.firestore):
+        p.error("give either a question bank or --firestore QUIZ_ID")
+    from import_questions import read_bank, resolve_images, validate
+
+    rows = (questions_from_firestore(args.firestore, args.credentials)
+            if args.firestore else read_bank(args.source))
+    base_dir = os.path.dirname(os.path.abspath(args.source)) if args.source else os.getcwd()
+    questions, problems = validate(rows)
+    problems += resolve_images(questions, base_dir)
+    for msg in problems:
+        print(f"  ❌ {msg}")
+    if problems:
+        return 1
+
+    digest = build([questions[i] for i in sorted(questions)], args.dest, base_dir)
+    print(f"✅ {args.dest}: {len(questions)} questions, "
+          f"{os.path.getsize(args.dest) / 1024:.0f} KiB, sha256 {digest[:12]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
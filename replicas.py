@@ -0,0 +1,367 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from game_state import STATE_DOC, _with_defaults
+
+# ─── Cross-replica coordination ───────────────────────────────────────────────
+# With several Streamlit replicas behind a load balancer, one of them (the
+# leader, elected through a lease in the shared store) holds the Firestore
+# listener and publishes the game state to a shared cache. Player sessions on
+# every replica read from that cache, so Firestore load does not grow with the
+# number of replicas or players.
+#
+# SHELF_SHARED_CACHE selects the store:
+#   redis://host:6379/0   RedisStore (needs the `redis` package)
+#   /dev/shm/shelf        FileStore: one file per key in a shared directory
+#   local                 LocalStore: in-process only (single replica, tests)
+# Unset: no coordination, every session reads Firestore as before.
+
+LEASE_TTL_S = 6
+STALE_S = 10                  # published values older than this are ignored
+
+LEADER_KEY = "leader"
+STATE_KEY = "state"
+
+log = logging.getLogger(__name__)
+
+
+# ─── Stores ───────────────────────────────────────────────────────────────────
+# Shared stores hold JSON, never pickle: anyone who can write to the Redis
+# instance or the directory must not be able to run code on the replicas.
+# Published values are plain dicts; datetimes travel as {"$datetime": ISO}.
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    raise TypeError(f"cannot store {type(value).__name__} in the shared cache")
+
+
+def _decode(obj):
+    if obj.keys() == {"$datetime"}:
+        return datetime.fromisoformat(obj["$datetime"])
+    return obj
+
+
+def _dumps(value):
+    return json.dumps(value, default=_encode).encode("utf-8")
+
+
+def _loads(raw):
+    return json.loads(raw, object_hook=_decode)
+
+
+class LocalStore:
+    """In-process stand-in with the same interface (for tests / one replica)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}           # key -> (value, expiry or None)
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+        if item is None or (item[1] is not None and item[1] < time.time()):
+            return None
+        return item[0]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+
+    def acquire_lease(self, key, owner, ttl):
+        """Take or renew `key` for `owner`; True if `owner` holds it now."""
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[1] < now or item[0] == owner:
+                self._data[key] = (owner, now + ttl)
+                return True
+            return False
+
+
+class FileStore:
+    """
+    Keys as JSON files in one directory (put it on tmpfs, e.g. /dev/shm,
+    shared by the replicas of one host). Writes are atomic renames; leases
+    are taken under an fcntl lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    def _read(self, key):
+        try:
+            with open(self._file(key), "rb") as f:
+                return _loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def get(self, key):
+        item = self._read(key)
+        if item is None or (item[1] is not None and item[1] < time.time()):
+            return None
+        return item[0]
+
+    def set(self, key, value, ttl=None):
+        fd, tmp = tempfile.mkstemp(dir=self.path)
+        with os.fdopen(fd, "wb") as f:
+            f.write(_dumps([value, time.time() + ttl if ttl else None]))
+        os.replace(tmp, self._file(key))
+
+    def acquire_lease(self, key, owner, ttl):
+        import fcntl
+
+        with open(self._file(key) + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                item = self._read(key)
+                if item is None or item[1] < time.time() or item[0] == owner:
+                    self.set(key, owner, ttl)
+                    return True
+                return False
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class RedisStore:
+    """Redis (or any Redis-compatible server) shared by all replicas."""
+
+    # renew if we own the lease, otherwise take it only if it is free
+    _LEASE = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('pexpire', KEYS[1], ARGV[2])
+    end
+    if redis.call('set', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then return 1 end
+    return 0
+    """
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("SHELF_SHARED_CACHE=redis://... needs the `redis` package") from e
+        self._r = redis.Redis.from_url(url)
+        self._lease = self._r.register_script(self._LEASE)
+
+    def get(self, key):
+        raw = self._r.get(f"shelf:{key}")
+        return None if raw is None else _loads(raw)
+
+    def set(self, key, value, ttl=None):
+        self._r.set(f"shelf:{key}", _dumps(value), px=int(ttl * 1000) if ttl else None)
+
+    def acquire_lease(self, key, owner, ttl):
+        return bool(self._lease(keys=[f"shelf:{key}"], args=[owner, int(ttl * 1000)]))
+
+
+def store_from_env():
+    """The store configured by SHELF_SHARED_CACHE, or None."""
+    spec = os.environ.get("SHELF_SHARED_CACHE", "").strip()
+    if not spec:
+        return None
+    if spec.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(spec)
+    if spec == "local":
+        return LocalStore()
+    return FileStore(spec)
+
+
+# ─── Leader / follower ────────────────────────────────────────────────────────
+def _plain(value):
+    """Firestore values -> plain Python for the store (timestamps to UTC datetimes)."""
+    if isinstance(value, datetime):
+        return datetime.fromtimestamp(value.timestamp(), tz=timezone.utc)
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+class Coordinator:
+    """
+    One per replica process. start() runs a background loop that keeps
+    trying to hold the leader lease; while it does, this replica listens to
+    Firestore and publishes to the store. Any replica can read.
+    """
+
+    def __init__(self, db, store, replica_id=None):
+        self.db = db
+        self.store = store
+        self.replica_id = replica_id or f"{os.uname().nodename}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.is_leader = False
+        self._state_watch = None
+        self._last_state = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ── reading (any replica) ─────────────────────────────────────
+    def state(self):
+        """The published game state, or None if there is no fresh copy."""
+        return self.store.get(STATE_KEY)
+
+    # ── leadership loop ───────────────────────────────────────────
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="replica-coordinator", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.is_leader = False
+        self._unwatch()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._tick()
+            except Exception:
+                # store or Firestore unreachable: stop publishing until the
+                # next tick, so a replica that takes over is the only leader
+                log.exception("replica %s: coordination failed, dropping leadership", self.replica_id)
+                self.is_leader = False
+                self._unwatch()
+            self._stop.wait(LEASE_TTL_S / 3)
+
+    def _tick(self):
+        leader = self.store.acquire_lease(LEADER_KEY, self.replica_id, LEASE_TTL_S)
+        if leader and not self.is_leader:
+            self.is_leader = True     # before _watch: its first callback publishes
+            self._watch()
+        elif not leader and self.is_leader:
+            self.is_leader = False    # late listener callbacks are dropped from now on
+            self._unwatch()
+        if leader and self._last_state is not None:
+            # heartbeat: keep the published state from going stale
+            self._publish(self._last_state)
+
+    def _publish(self, state):
+        """Stores `state` unless a newer version is already published."""
+        current = self.store.get(STATE_KEY)
+        if current is not None and current.get("version", 0) > state["version"]:
+            return
+        self.store.set(STATE_KEY, state, STALE_S)
+
+    def _watch(self):
+        self._state_watch = self.db.document(STATE_DOC).on_snapshot(self._on_state)
+
+    def _unwatch(self):
+        watch, self._state_watch = self._state_watch, None
+        self._last_state = None
+        if watch is not None:
+            try:
+                watch.unsubscribe()
+            except Exception:
+                log.exception("replica %s: could not unsubscribe", self.replica_id)
+
+    # ── listener callback (leader only) ───────────────────────────
+    def _on_state(self, docs, changes, read_time):
+        # runs on the Firestore listener thread, possibly after we lost the lease
+        if not self.is_leader:
+            return
+        data = docs[0].to_dict() if docs and docs[0].exists else None
+        state = _plain(_with_defaults(data))
+        self._last_state = state
+        self._publish(state)
+
+
+if __name__ == "__main__":
+    # Self-check with the in-process store and a fake Firestore document:
+    # one leader publishes, a follower reads, and the follower takes over
+    # once the leader stops and its lease runs out.
+    #
+    #   python replicas.py
+    LEASE_TTL_S = 0.3
+
+    class FakeSnapshot:
+        exists = True
+
+        def __init__(self, data):
+            self._data = data
+
+        def to_dict(self):
+            return dict(self._data)
+
+    class FakeWatch:
+        def __init__(self, listeners, callback):
+            self._listeners, self._callback = listeners, callback
+
+        def unsubscribe(self):
+            self._listeners.remove(self._callback)
+
+    class FakeDocument:
+        def __init__(self):
+            self.data = {"phase": "question", "current_index": 0, "version": 1}
+            self.listeners = []
+
+        def on_snapshot(self, callback):
+            self.listeners.append(callback)
+            callback([FakeSnapshot(self.data)], [], None)
+            return FakeWatch(self.listeners, callback)
+
+        def update(self, **fields):
+            self.data.update(fields)
+            for callback in list(self.listeners):
+                callback([FakeSnapshot(self.data)], [], None)
+
+    class FakeDb:
+        def __init__(self):
+            self.doc = FakeDocument()
+
+        def document(self, path):
+            assert path == STATE_DOC
+            return self.doc
+
+    def wait_for(check, timeout=3.0):
+        end = time.monotonic() + timeout
+        while not check():
+            assert time.monotonic() < end, "timed out"
+            time.sleep(0.02)
+
+    db, store = FakeDb(), LocalStore()
+    a = Coordinator(db, store, "replica-a").start()
+    wait_for(lambda: a.is_leader)
+    b = Coordinator(db, store, "replica-b").start()
+    time.sleep(LEASE_TTL_S)
+    assert not b.is_leader and len(db.doc.listeners) == 1
+
+    # publish (leader) / read (follower)
+    assert b.state()["version"] == 1
+    db.doc.update(phase="revealed", version=2)
+    assert b.state()["phase"] == "revealed" and b.state()["version"] == 2
+
+    # handover: the follower becomes the only leader after the lease expires
+    a.stop()
+    wait_for(lambda: b.is_leader)
+    assert not a.is_leader and len(db.doc.listeners) == 1
+    db.doc.update(phase="question", current_index=1, version=3)
+    assert a.state()["current_index"] == 1
+
+    # a late callback from a replica that lost the lease publishes nothing,
+    # and even a leader never replaces a newer published version
+    a._on_state([FakeSnapshot({"phase": "waiting", "version": 2})], [], None)
+    b._publish({"phase": "waiting", "version": 2})
+    assert b.state()["version"] == 3 and b.state()["current_index"] == 1
+
+    b.stop()
+
+    # shared values are JSON on disk, timestamps included
+    with tempfile.TemporaryDirectory() as tmp:
+        files = FileStore(tmp)
+        opened = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        files.set(STATE_KEY, {"version": 4, "opened_at": {"0": opened}}, STALE_S)
+        assert files.get(STATE_KEY)["opened_at"]["0"] == opened
+        with open(files._file(STATE_KEY), "rb") as f:
+            json.loads(f.read())
+    print("ok: publish/read, lease handover, stale publishes, JSON store")
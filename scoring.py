@@ -0,0 +1,34 @@
+from analytics import iter_responses, responses_frame, session_label
+
+# ─── Leaderboard ──────────────────────────────────────────────────────────────
+# Speed is the time from the question opening (game_state "opened_at", stamped
+# by game_state.transition) to the player's answer, not the wall-clock time of
+# the answer itself.
+
+
+def opened_at_from_state(state: dict) -> dict:
+    """{question_id: open time} from the game_state/current document."""
+    return {int(k): v for k, v in (state.get("opened_at") or {}).items()}
+
+
+def leaderboard(df):
+    """
+    Ranks players by MC answers correct (desc), then mean latency of those
+    correct answers (asc). Returns a frame with nickname, correct, avg_latency_s.
+    """
+    hits = df[df["correct"]]
+    board = (hits.groupby("nickname", observed=True)
+                 .agg(correct=("correct", "size"),
+                      avg_latency_s=("latency_s", "mean"))
+                 .reset_index())
+    board["nickname"] = board["nickname"].astype("string")
+    return board.sort_values(["correct", "avg_latency_s"],
+                             ascending=[False, True],
+                             kind="stable").reset_index(drop=True)
+
+
+def session_frame(db, room, questions):
+    """Reads `room`'s responses once, with latency relative to each question's open time."""
+    state = db.document("game_state/current").get().to_dict() or {}
+    return responses_frame(iter_responses(db, room), questions, session_label(),
+                           opened_at=opened_at_from_state(state))
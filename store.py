@@ -0,0 +1,97 @@
+import hashlib
+import re
+import unicodedata
+
+from firebase_admin import firestore
+
+from game_state import submit_answer
+
+# ─── Firestore data-access helpers ────────────────────────────────────────────
+# Everything here takes the Firestore client explicitly so it can be shared by
+# app.py and app_nopicture.py.
+
+
+def normalize_nickname(nick: str) -> str:
+    """
+    Canonical form used for uniqueness: Unicode-normalized, case-folded,
+    with runs of whitespace collapsed. "  Dr  Bob " and "dr bob" are the
+    same player.
+    """
+    nick = unicodedata.normalize("NFKC", nick)
+    return re.sub(r"\s+", " ", nick).strip().casefold()
+
+
+def participant_id(nick: str) -> str:
+    """Deterministic document ID for a nickname (safe for any characters)."""
+    return hashlib.sha1(normalize_nickname(nick).encode("utf-8")).hexdigest()
+
+
+@firestore.transactional
+def _claim(transaction, ref, data):
+    snap = ref.get(transaction=transaction)
+    if not snap.exists:
+        transaction.create(ref, data)
+        return data["nickname"]
+    stored = snap.to_dict() or {}
+    return stored.get("nickname") if stored.get("browser") == data["browser"] else None
+
+
+def join_participant(db, nick: str, browser: str):
+    """
+    Registers `nick` under participants/<participant_id> for `browser` (a
+    random per-browser token). Idempotent for that browser: a refresh or
+    double click re-uses the existing document instead of adding a
+    duplicate. Returns the nickname as first registered ("Sam" even if this
+    call said "sam"), so responses and the leaderboard use one spelling, or
+    None if another browser holds the nickname (in any case or spacing
+    variant), since it would share their responses.
+
+    The token lives in the page URL, so a new tab without it (e.g. the QR
+    code scanned again) counts as another browser.
+    """
+    ref = db.collection("participants").document(participant_id(nick))
+    return _claim(db.transaction(), ref, {
+        "nickname":     nick.strip(),
+        "nickname_key": normalize_nickname(nick),
+        "browser":      browser,
+        "timestamp":    firestore.SERVER_TIMESTAMP,
+    })
+
+
+def response_id(room: str, question_id: int, nick: str) -> str:
+    """
+    One document per (room, question, player): <room>_<question>_<hash>. The
+    hash mixes in the question, so ordering by ID (see answer_wall.py) is a
+    different shuffle of the players on every question.
+    """
+    key = f"{question_id}:{participant_id(nick)}"
+    return f"{room}_{question_id}_{hashlib.sha1(key.encode('utf-8')).hexdigest()}"
+
+
+def submit_response(db, room: str, question_id: int, nick: str, answer, client_key=None):
+    """
+    Create-or-overwrite the player's answer for this question. A reload and
+    resubmit replaces the earlier answer instead of adding another document,
+    so a per-question query returns at most one response per player.
+    Raises game_state.QuestionClosed if the question is no longer open.
+    `client_key` is an idempotency key for retried submissions (see
+    offline_client.py): resending the same key is a no-op.
+    """
+    ref = db.collection("responses").document(response_id(room, question_id, nick))
+    data = {
+        "room":        room,
+        "question_id": question_id,
+        "nickname":    nick,
+        "answer":      answer,
+        "timestamp":   firestore.SERVER_TIMESTAMP,
+    }
+    if client_key is not None:
+        data["client_key"] = client_key
+    # rejected (QuestionClosed) once the question is revealed or timed out
+    return submit_answer(db, ref, question_id, data)
+
+
+def has_response(db, room: str, question_id: int, nick: str) -> bool:
+    """Single-document lookup used to restore the submitted state after a reload."""
+    ref = db.collection("responses").document(response_id(room, question_id, nick))
+    return ref.get().exists
@@ -0,0 +1,124 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+# ─── Lightweight rerun tracing ────────────────────────────────────────────────
+# Every Streamlit session runs in its own thread of the same process, so the
+# span registry is module level (shared) and guarded by a lock.
+#
+#   with span("load_questions"):
+#       ...
+#
+# Durations are aggregated into per-span histograms in memory. If the
+# SHELF_TRACE_FILE environment variable is set, the raw events are also
+# written as a Chrome trace (open it in chrome://tracing or Perfetto).
+
+# Histogram bucket upper bounds, in milliseconds (last bucket is open ended)
+BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+MAX_EVENTS = 50_000
+
+_lock = threading.Lock()
+_stats = {}
+_events = deque(maxlen=MAX_EVENTS)
+_t0 = time.perf_counter()
+
+TRACE_FILE = os.environ.get("SHELF_TRACE_FILE", "").strip()
+
+
+def _record(name, start, dur):
+    ms = dur * 1000.0
+    with _lock:
+        s = _stats.get(name)
+        if s is None:
+            s = _stats[name] = {
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "buckets": [0] * (len(BUCKETS_MS) + 1),
+            }
+        s["count"] += 1
+        s["total_ms"] += ms
+        s["max_ms"] = max(s["max_ms"], ms)
+        b = 0
+        while b < len(BUCKETS_MS) and ms > BUCKETS_MS[b]:
+            b += 1
+        s["buckets"][b] += 1
+        if TRACE_FILE:
+            _events.append({
+                "name": name,
+                "ph":   "X",
+                "ts":   (start - _t0) * 1e6,   # microseconds
+                "dur":  dur * 1e6,
+                "pid":  os.getpid(),
+                "tid":  threading.get_ident(),
+            })
+
+
+@contextmanager
+def span(name):
+    """
+    Times the enclosed block and records it under `name`.
+    Spans may be nested; each one is recorded on its own.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, start, time.perf_counter() - start)
+
+
+def traced(name=None):
+    """Decorator form of `span`, defaulting to the function's name."""
+    def deco(fn):
+        label = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def summary():
+    """
+    Returns {span_name: {count, mean_ms, max_ms, buckets}} where `buckets`
+    maps a label like "<=10ms" to the number of samples in that bucket.
+    """
+    labels = [f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+    out = {}
+    with _lock:
+        for name, s in _stats.items():
+            out[name] = {
+                "count":   s["count"],
+                "mean_ms": s["total_ms"] / s["count"],
+                "max_ms":  s["max_ms"],
+                "buckets": {l: n for l, n in zip(labels, s["buckets"]) if n},
+            }
+    return out
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _events.clear()
+
+
+def write_chrome_trace(path=None):
+    """Dumps the recorded events in Chrome trace-event JSON format."""
+    path = path or TRACE_FILE
+    if not path:
+        return
+    with _lock:
+        events = list(_events)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+if TRACE_FILE:
+    atexit.register(write_chrome_trace)